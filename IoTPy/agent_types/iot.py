@@ -15,6 +15,10 @@ result of the call.
 The iot agent has only two parameters: func and in_stream.
 The iot_merge agent also has two parameters func and
 in_streams where in_streams is a list of input streams.
+The iot_fused agent has parameters funcs and in_stream
+where funcs is a list of functions; it behaves like a
+collection of iot agents, one for each function, that
+share a single transition.
 Typically, func uses positional or keyword arguments
 specified in *args or **kwargs, respectively.
 These arguments may include streams and agents.
@@ -49,7 +53,9 @@ def iot(func, in_stream, *args, **kwargs):
            function on a single array or a single list and
            *args, **kwargs. Note that func does not operate
            on a single element of a list or an array. func
-           operates on the entire list or array.
+           operates on the entire list or array. If in_stream
+           is a StreamArray then the array is a C-contiguous
+           view into the buffer of in_stream; it is not a copy.
         in_stream: Stream
             The input stream of this function, i.e., the
             input stream of the agent executing this
@@ -60,16 +66,22 @@ def iot(func, in_stream, *args, **kwargs):
          The agent created by this function.
 
     """
+    # Check the type of func once, when the agent is created,
+    # rather than on every state transition.
+    check_function_type('iot', func)
+
     # The transition function for the map agent.
     def transition(in_lists, state):
         # STEP 1. GET THE SLICES -- LISTS OR ARRAYS -- INTO STREAMS. 
         # A is a list or an array
-        A = in_lists[0].list[in_lists[0].start : in_lists[0].stop]
+        in_list = in_lists[0]
+        start = in_list.start
+        A = in_list.list[start : in_list.stop]
 
         # STEP 2. CALL FUNC.
         # new_start is a nonnegative number. It specifies that this
         # agent will no longer read elements of in_stream before
-        # index in_lists[0].start + new_start
+        # index start + new_start
         new_start = func(A, *args, **kwargs)
         assert isinstance(new_start, int), \
           'func in iot() must return a nonnegative integer' \
@@ -82,13 +94,98 @@ def iot(func, in_stream, *args, **kwargs):
         # Return (i) list of output stream: this is empty.
         # (ii) next state: this is unchanged.
         # (iii) list of new pointers into input streams.
-        return ([], state, [new_start+in_lists[0].start])
+        return ([], state, [new_start + start])
     # Finished transition
 
     # Create agent
     # This agent has no output streams, and so out_streams is [].
     return Agent([in_stream], [], transition)
 
+def iot_fused(funcs, in_stream, args_list=None, kwargs_list=None):
+    """
+    Same as creating one iot agent for each function in funcs
+    on the same in_stream, except that a single agent calls all
+    the functions in a single transition. So the input stream
+    is sliced once, rather than once for each function, and the
+    scheduler runs one transition instead of len(funcs).
+
+    Each function in funcs has the same specification as func in
+    iot: it operates on a slice of in_stream and returns an index
+    into the slice. Each function has its own pointer into
+    in_stream; so a function never sees elements earlier than the
+    index that it returned previously, even if other functions
+    return smaller indices.
+
+    Parameters
+    ----------
+        funcs: list of functions
+           funcs[j] is a function on a single array or a single
+           list and *args_list[j], **kwargs_list[j].
+        in_stream: Stream
+            The input stream of the agent.
+        args_list: list of lists or tuples, optional
+            args_list[j] is the list of positional arguments of
+            funcs[j]. The default is no positional arguments.
+        kwargs_list: list of dicts, optional
+            kwargs_list[j] is the dict of keyword arguments of
+            funcs[j]. The default is no keyword arguments.
+    Returns
+    -------
+        Agent.
+         The agent created by this function.
+
+    """
+    num_funcs = len(funcs)
+    if args_list is None:
+        args_list = [()]*num_funcs
+    if kwargs_list is None:
+        kwargs_list = [{}]*num_funcs
+    assert num_funcs > 0, \
+      'iot_fused() must be called with at least one function'
+    assert len(args_list) == num_funcs and len(kwargs_list) == num_funcs, \
+      'iot_fused() must have one entry in args_list and kwargs_list for'\
+      ' each function. The number of functions is {0}'.format(num_funcs)
+    for func in funcs:
+        check_function_type('iot_fused', func)
+    calls = list(zip(funcs, args_list, kwargs_list))
+
+    # The state of the agent is a list of offsets with one offset
+    # for each function. offsets[j] is the pointer of funcs[j]
+    # into in_stream relative to the pointer of the agent, which
+    # is the smallest pointer over all the functions. Offsets are
+    # relative, rather than absolute, because the stream updates
+    # the pointer of the agent when it shifts its recent buffer.
+    def transition(in_lists, offsets):
+        # STEP 1. GET THE SLICE INTO THE STREAM. This slice is
+        # shared by all the functions.
+        in_list = in_lists[0]
+        start = in_list.start
+        A = in_list.list[start : in_list.stop]
+
+        # STEP 2. CALL EACH FUNCTION ON ITS PART OF THE SLICE.
+        # The new pointer of funcs[j], relative to start, is
+        # offsets[j] plus the value returned by funcs[j].
+        new_offsets = []
+        for (func, args, kwargs), offset in zip(calls, offsets):
+            new_start = func(A[offset:], *args, **kwargs)
+            assert isinstance(new_start, int) and new_start >= 0, \
+              'func in iot_fused() must return a nonnegative integer' \
+              ' but it returned {0}'.format(new_start)
+            new_offsets.append(offset + new_start)
+
+        # STEP 3. RETURN VALUES FOR STANDARD AGENT
+        # The agent will no longer read elements before the
+        # smallest pointer, and the offsets are made relative to
+        # that pointer.
+        new_start = min(new_offsets)
+        return ([], [offset - new_start for offset in new_offsets],
+                [new_start + start])
+    # Finished transition
+
+    # Create agent
+    # This agent has no output streams, and so out_streams is [].
+    return Agent([in_stream], [], transition, state=[0]*num_funcs)
+
 def iot_merge(func, in_streams, *args, **kwargs):
     """
     Similar to iot except that the primary argument of iot_merge
@@ -125,40 +222,52 @@ def iot_merge(func, in_streams, *args, **kwargs):
          The agent created by this function.
 
     """
+    # Check the type of func once, when the agent is created,
+    # rather than on every state transition.
+    check_function_type('iot_merge', func)
+
     # The transition function for the map agent.
     def transition(in_lists, state):
         # 1. GET THE SLICES -- LISTS OR ARRAYS -- INTO STREAMS. 
         # A_list is a list of lists or a list of arrays.
-        A_list = [in_list.list[in_list.start : in_list.stop]
-                  for in_list in in_lists]
+        # Unpack the fields of all the InLists in a single step:
+        # lists[j], starts[j] and stops[j] are the list, start and
+        # stop of the j-th input list.
+        lists, starts, stops = zip(*in_lists)
+        A_list = [L[start : stop]
+                  for L, start, stop in zip(lists, starts, stops)]
 
         # 2. CALL FUNC.
         # func must return a list of indices (new_starts) into
         # the input lists that indicate that it will no longer
         # read elements earlier than the pointers.
         new_starts = func(A_list, *args, **kwargs)
-        assert isinstance(new_starts, list), \
-          'func in iot_merge() must return list of new starting indices'\
-          ' into the input lists but function returns {0}'.\
-          format(new_starts)
-        assert len(new_starts) == len(A_list), \
-          'func in iot_merge() must return one starting index for each' \
-          ' input list. The number of input lists is {0} ' \
-          ' and the number of values returned is {1}'.\
-          format(len(A_list), len(new_starts))
-        for new_start in new_starts:
-            assert isinstance(new_start, int) and (new_start >= 0), \
-              ' func in iot_merge must return a nonnegative integer for each' \
-              ' input list. One of the values returned is {0}'.\
-              format(new_start)
+        # Check the values returned by func. The loop is inside
+        # if __debug__ so that python -O removes the loop as well
+        # as the assertions.
+        if __debug__:
+            assert isinstance(new_starts, list), \
+              'func in iot_merge() must return list of new starting indices'\
+              ' into the input lists but function returns {0}'.\
+              format(new_starts)
+            assert len(new_starts) == len(A_list), \
+              'func in iot_merge() must return one starting index for each' \
+              ' input list. The number of input lists is {0} ' \
+              ' and the number of values returned is {1}'.\
+              format(len(A_list), len(new_starts))
+            for new_start in new_starts:
+                assert isinstance(new_start, int) and (new_start >= 0), \
+                  ' func in iot_merge must return a nonnegative integer for each' \
+                  ' input list. One of the values returned is {0}'.\
+                  format(new_start)
 
         # 3. RETURN VALUES FOR STANDARD AGENT
-        for i in range(len(new_starts)):
-            new_starts[i] += in_lists[i].start
         # Return (i) list of output stream: this is empty.
         # (ii) next state: this is unchanged.
         # (iii) new pointers into input streams.
-        return ([], state, new_starts)
+        return ([], state,
+                [new_start + start
+                 for new_start, start in zip(new_starts, starts)])
     # Finished transition
 
     # Create agent
@@ -292,33 +292,42 @@ def stream_to_json(in_stream, filename):
 def stream_to_file(
         in_stream, filename, element_function=None, state=None,
         **kwargs):
-    def simple_append(element, filename):
+    # These functions operate on a list: a slice of in_stream. The
+    # file is opened once for each list, and all the lines for the
+    # list are written in a single call to write().
+    def simple_append(input_list, filename):
         with open(filename, 'a') as the_file:
-            the_file.write(str(element) + '\n')
+            the_file.write(
+                ''.join([str(element) + '\n' for element in input_list]))
     def function_stateless_append(
-            element, filename, element_function, **kw):
+            input_list, filename, element_function, **kw):
         with open(filename, 'a') as the_file:
-            the_file.write(str(element_function(element, **kw)) + '\n')
+            the_file.write(
+                ''.join([str(element_function(element, **kw)) + '\n'
+                         for element in input_list]))
     def function_stateful_append(
-            element, state, filename, element_function, **kw):
-        next_output, next_state = element_function(element, state, **kw)
+            input_list, state, filename, element_function, **kw):
+        lines = []
+        for element in input_list:
+            next_output, state = element_function(element, state, **kw)
+            lines.append(str(next_output) + '\n')
         with open(filename, 'a') as the_file:
-            the_file.write(str(next_output) + '\n')
-        return next_state
+            the_file.write(''.join(lines))
+        return state
 
     if element_function is None:
-        sink(simple_append, in_stream, filename=filename)
+        sink_list(simple_append, in_stream, filename=filename)
     elif state is None:
         ext_kw = kwargs
         ext_kw['filename'] = filename
         ext_kw['element_function'] = element_function
-        sink(function_stateless_append, in_stream, **ext_kw) 
+        sink_list(function_stateless_append, in_stream, **ext_kw) 
     else:
         # function and state are both non None
         ext_kw = kwargs
         ext_kw['filename'] = filename
         ext_kw['element_function'] = element_function
-        sink(function_stateful_append, in_stream, state, **ext_kw)
+        sink_list(function_stateful_append, in_stream, state, **ext_kw)
 
 #----------------------------------------------------
 def stream_to_queue(
@@ -912,6 +912,9 @@ class MulticoreProcess(object):
             # buffer_ptr is  multiprocessing.Value
             buffer_end_ptr = buffer_ptr.value + n
             buffer_current_ptr = buffer_ptr.value
+            # Write into the shared memory of the buffer through a
+            # NumPy array. See buffer_as_array().
+            buffer = buffer_as_array(buffer)
         if buffer_end_ptr < BUFFER_SIZE:
             # In this case, don't need to wrap around the
             # end of the buffer.
@@ -920,8 +923,8 @@ class MulticoreProcess(object):
             # In this case, must wrap around the end of
             # the circular buffer.
             # remaining_space is the space remaining from
-            # buffer_ptr to the end of the buffer.
-            remaining_space = BUFFER_SIZE - buffer_end_ptr
+            # buffer_current_ptr to the end of the buffer.
+            remaining_space = BUFFER_SIZE - buffer_current_ptr
             # Copy remaining_space elements of the list
             # to fill up the buffer.
             buffer[buffer_current_ptr:] =  data[:remaining_space]
@@ -1200,35 +1203,51 @@ def copy_buffer_segment(message, out_stream, buffer, in_stream_type):
     if end == start:
         # Empty message. So take no action.
         return
+    # Read the shared memory of the buffer through a NumPy array.
+    # See buffer_as_array().
+    buffer = buffer_as_array(buffer)
     if end > start:
         # The end pointer hasn't crossed the termination of the
         # circular buffer. So, this segment is the linear
         # sequence from start to end.
         return_value = buffer[start:end]
-    else:
+    elif isinstance(buffer, np.ndarray):
         # The return value is read from the circular buffer
         # by going to the end of the buffer and adding values
         # from the beginning of the buffer.
-        # The segment includes the values in the remaining_space
-        # in the buffer concatenated with the values in the
-        # buffer from cells 0 to end.
-        remaining_space = BUFFER_SIZE - start
-        segment_length = remaining_space + end
-        # Set up an array with appropriate length to be filled in.
-        return_value = multiprocessing.Array(in_stream_type, range(segment_length))
-        # Copy the buffer from start to the termination of the buffer into
-        # the first part of return_value.
-        return_value[:remaining_space] = \
-            multiprocessing.Array(in_stream_type, buffer[start:])
-        # Roll over the end of the circular buffer. Copy the buffer
-        # in cells 0 to end into the second part of remaining_space.
-        return_value[remaining_space:] = \
-            multiprocessing.Array(in_stream_type, buffer[:end])
-            
+        # The segment includes the values from start to the
+        # termination of the buffer concatenated with the values
+        # in the buffer from cells 0 to end.
+        return_value = np.concatenate((buffer[start:], buffer[:end]))
+    else:
+        # Same as the previous case for a buffer that cannot be
+        # viewed as a NumPy array.
+        return_value = list(buffer[start:]) + list(buffer[:end])
+
+    # out_stream.extend() copies return_value into out_stream, and
+    # so return_value may be a view into the buffer.
     out_stream.extend(
-        np.array(return_value,
-                 dtype=multiprocessing_type_to_np_type[in_stream_type]))
+        np.asarray(return_value,
+                   dtype=multiprocessing_type_to_np_type[in_stream_type]))
     return
+
+def buffer_as_array(buffer):
+    """
+    Returns a NumPy array that shares memory with buffer which is
+    a multiprocessing.Array. Reading and writing slices of this
+    array does not acquire the lock of buffer and does not convert
+    each element into a Python object. The lock isn't required
+    because each buffer has a single writer which puts a message
+    (start, end) into the queue of each reader only after it has
+    written the segment between start and end.
+
+    Buffers of types, such as ctypes.c_wchar, that NumPy cannot
+    view are returned unchanged.
+
+    """
+    if buffer.get_obj()._type_ is ctypes.c_wchar:
+        return buffer
+    return np.ctypeslib.as_array(buffer.get_obj())
 #-------------------------------------------------------------------
 
 def copy_data_to_stream(data, proc, stream_name):
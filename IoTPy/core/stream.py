@@ -745,6 +745,16 @@ class StreamArray(Stream):
         self.start = dict()
         self.num_elements_lost = dict()
         self.subscribers_set = set()
+        # Select the function that checks the dimension of arrays
+        # that extend this stream. The dimension of a stream never
+        # changes, and so the selection is made once, here, rather
+        # than in each call to extend().
+        if isinstance(dimension, int) and dimension <= 1:
+            self._check_dimension = self._check_dimension_0
+        elif isinstance(dimension, int):
+            self._check_dimension = self._check_dimension_int
+        else:
+            self._check_dimension = self._check_dimension_tuple
         if initial_value is not None:
             self.extend(initial_value)
 
@@ -764,6 +774,42 @@ class StreamArray(Stream):
             d.insert(0, size)
             return np.zeros(d, self.dtype)
         
+    def _check_dimension_0(self, output_array):
+        # If dimension is 0 then output_array must be a 1-D array. Equivalently
+        # the number of "columns" of this array must be 1.
+        assert(len(output_array.shape) == 1),\
+          'Extending StreamArray {0} which has shape (i.e. dimension) 0' \
+          ' by an array with incompatible shape {1}'.\
+          format(self.name, output_array.shape[1:])
+
+    def _check_dimension_int(self, output_array):
+        # If dimension is 2 or higher, then output_array must be a 2-D
+        # numpy array, where the number of columns is dimension.
+        # output_array.shape[1] is the number of columns in output_array.
+        assert (len(output_array.shape) > 0), \
+          'Extending StreamArray {0} which has shape (i.e. dimesion) {1}'\
+            ' with an array with incompatible shape {2}'.\
+            format(self.name, self.dimension, output_array.shape)
+        assert (len(output_array.shape[1:]) > 0), \
+          'Extending StreamArray {0} which has shape (i.e. dimesion) {1}'\
+            ' with an array with incompatible shape {2}'.\
+            format(self.name, self.dimension, output_array.shape[1])
+        assert (output_array.shape[1:][0] == self.dimension),\
+            'Extending StreamArray {0} which has shape (i.e. dimension) {1}'\
+            ' with an array with incompatible shape {2}'.\
+            format(self.name, self.dimension, output_array.shape[1:][0])
+
+    def _check_dimension_tuple(self, output_array):
+        # If dimension is a tuple, list or array, then output_array is a numpy array
+        # whose dimensions are output_array.shape[1:].
+        # The number of elements entered into the stream is output_array.shape[0:].
+        # The dimension of each row of output_array must be the same as the
+        # dimension of the entire stream.
+        assert(output_array.shape[1:] == self.dimension),\
+            'Extending StreamArray {0} which has shape (i.e. dimesion) {1}'\
+            ' with an array with incompatible shape {2}'.\
+            format(self.name, self.dimension, output_array.shape[1:])
+
     def append(self, value):
         """
         Parameters
@@ -836,46 +882,9 @@ class StreamArray(Stream):
           ' which has an incompatible type {3}'.format(
               self.name, self.dtype, output_array, output_array.dtype)
 
-        # Check dimensions of the array.
-        # If dimension is 0 then output_array must be a 1-D array. Equivalently
-        # the number of "columns" of this array must be 1.
-        #if self.dimension == 0:
-        if self.dimension == 0 or self.dimension == 1:
-            assert(len(output_array.shape) == 1),\
-              'Extending StreamArray {0} which has shape (i.e. dimension) 0' \
-              ' by an array with incompatible shape {1}'.\
-              format(self.name, output_array.shape[1:])
-
-        ## If dimension is a positive integer, then output_array must be a 2-D
-        # If dimension is 2 or higher, then output_array must be a 2-D
-        # numpy array, where the number of columns is dimension.
-        if isinstance(self.dimension, int) and self.dimension > 1:
-            # output_array.shape[1] is the number of columns in output_array.
-            assert (len(output_array.shape) > 0), \
-              'Extending StreamArray {0} which has shape (i.e. dimesion) {1}'\
-                ' with an array with incompatible shape {2}'.\
-                format(self.name, self.dimension, output_array.shape)
-            assert (len(output_array.shape[1:]) > 0), \
-              'Extending StreamArray {0} which has shape (i.e. dimesion) {1}'\
-                ' with an array with incompatible shape {2}'.\
-                format(self.name, self.dimension, output_array.shape[1])
-            assert (output_array.shape[1:][0] == self.dimension),\
-                'Extending StreamArray {0} which has shape (i.e. dimension) {1}'\
-                ' with an array with incompatible shape {2}'.\
-                format(self.name, self.dimension, output_array.shape[1:][0])
-                
-        # If dimension is a tuple, list or array, then output_array is a numpy array
-        # whose dimensions are output_array.shape[1:].
-        # The number of elements entered into the stream is output_array.shape[0:].
-        # The dimension of each row of output_array must be the same as the
-        # dimension of the entire stream.
-        if (isinstance(self.dimension, tuple) or
-            isinstance(self.dimension, list) or
-            isinstance(self.dimension, np.ndarray)):
-            assert(output_array.shape[1:] == self.dimension),\
-                'Extending StreamArray {0} which has shape (i.e. dimesion) {1}'\
-                ' with an array with incompatible shape {2}'.\
-                format(self.name, self.dimension, output_array.shape[1:])
+        # Check dimensions of the array. The function that checks
+        # the dimensions is selected in __init__().
+        self._check_dimension(output_array)
 
         # Finished checking types of elements of output_array
         #----------------------------------------------
@@ -0,0 +1,52 @@
+"""
+This module defines a moving median which is used, for example,
+to smooth offsets obtained from ntp servers.
+
+"""
+import bisect
+import collections
+
+class moving_median(object):
+    """
+    The median of the most recent window_size values, updated one
+    value at a time. The values in the window are kept sorted, so
+    an update is a binary search and an insertion rather than a
+    sort of the window, and the median is read directly from the
+    middle.
+
+    Parameters
+    ----------
+    window_size: int
+      positive int which is the maximum number of values in the
+      window.
+
+    Attributes
+    ----------
+    window: collections.deque
+      The values in the window in the order in which they were
+      appended.
+    sorted_window: list
+      The values in the window in sorted order.
+
+    """
+    def __init__(self, window_size):
+        self.window = collections.deque(maxlen=window_size)
+        self.sorted_window = []
+    def append(self, value):
+        if len(self.window) == self.window.maxlen:
+            # Remove the oldest value, which is dropped from
+            # the window when value is appended.
+            oldest = self.window[0]
+            del self.sorted_window[
+                bisect.bisect_left(self.sorted_window, oldest)]
+        self.window.append(value)
+        bisect.insort(self.sorted_window, value)
+    def median(self):
+        # Returns 0.0 if the window is empty.
+        n = len(self.sorted_window)
+        if not n:
+            return 0.0
+        mid = n//2
+        if n % 2:
+            return self.sorted_window[mid]
+        return (self.sorted_window[mid-1] + self.sorted_window[mid])/2.0
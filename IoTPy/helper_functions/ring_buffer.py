@@ -0,0 +1,53 @@
+"""
+This module defines a ring buffer of floats backed by a numpy
+array. It is used, for example, to keep the most recent offsets
+obtained from ntp servers.
+
+"""
+import numpy as np
+
+class ring_buffer(object):
+    """
+    The most recent values, at most capacity of them, stored in a
+    numpy array. Statistics over a window of recent values, such
+    as a moving-window average, are computed on arrays rather than
+    by scanning a list.
+
+    Parameters
+    ----------
+    capacity: int
+      positive int which is the maximum number of values kept.
+
+    Attributes
+    ----------
+    buffer: np.ndarray
+      1D float64 array of length capacity in which the values
+      are stored. It is a circular buffer.
+    cursor: int
+      The number of values appended so far. The next value is
+      written to buffer[cursor % capacity].
+
+    """
+    def __init__(self, capacity):
+        self.buffer = np.zeros(capacity, dtype=np.float64)
+        self.cursor = 0
+    def append(self, value):
+        self.buffer[self.cursor % len(self.buffer)] = value
+        self.cursor += 1
+    def recent(self, n=None):
+        # Returns the n most recent values, oldest first, or all the
+        # values if n is None. The array is a view into the buffer
+        # unless the n values wrap around the end of the buffer.
+        capacity = len(self.buffer)
+        size = min(self.cursor, capacity)
+        n = size if n is None else min(n, size)
+        stop = self.cursor % capacity or capacity
+        if n <= stop:
+            return self.buffer[stop-n : stop]
+        return np.concatenate(
+            (self.buffer[capacity-(n-stop):], self.buffer[:stop]))
+    def mean(self, n=None):
+        # Returns the mean of the n most recent values, or 0.0 if
+        # the buffer is empty.
+        values = self.recent(n)
+        return float(values.mean()) if values.size else 0.0
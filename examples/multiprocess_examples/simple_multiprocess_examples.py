@@ -124,10 +124,10 @@ def example_2():
 
 
 if __name__ == '__main__':
-    print 'Starting example_1'
+    print ('Starting example_1')
     example_1()
-    print 'Finished example_1'
-    print
-    print 'Starting example_2'
+    print ('Finished example_1')
+    print ('')
+    print ('Starting example_2')
     example_2()
-    print 'Finished example_2'
+    print ('Finished example_2')
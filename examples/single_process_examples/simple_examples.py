@@ -112,7 +112,7 @@ def single_process_single_source_map_list_example_1():
         return source_list_to_stream(source_list, out_stream)
     def compute_func(in_streams, out_streams):
         def f(lst):
-            return [v*2 if v%2 else v/2 for v in lst]
+            return [v*2 if v%2 else v//2 for v in lst]
         check_list = f(source_list)
         t = Stream()
         map_list(
@@ -199,38 +199,38 @@ def single_process_single_source_map_window_example_1():
     make_and_run_process(compute_func)
 
 if __name__ == '__main__':
-    print 'starting single_process_single_source_map_element_example_1'
+    print ('starting single_process_single_source_map_element_example_1')
     single_process_single_source_map_element_example_1()
-    print 'finished single_process_single_source_map_element_example_1'
-    print
-    print 'starting single_process_single_source_map_element_example_3'
+    print ('finished single_process_single_source_map_element_example_1')
+    print ('')
+    print ('starting single_process_single_source_map_element_example_3')
     single_process_single_source_map_element_example_3()
-    print 'finished single_process_single_source_map_element_example_3'
-    print
-    print 'starting single_process_single_source_filter_element_example_1'
+    print ('finished single_process_single_source_map_element_example_3')
+    print ('')
+    print ('starting single_process_single_source_filter_element_example_1')
     single_process_single_source_filter_element_example_1()
-    print 'finished single_process_single_source_filter_element_example_1'
-    print
-    print 'starting single_process_single_source_filter_element_example_1'
+    print ('finished single_process_single_source_filter_element_example_1')
+    print ('')
+    print ('starting single_process_single_source_filter_element_example_1')
     single_process_single_source_filter_element_example_1()
-    print 'finished single_process_single_source_filter_element_example_1'
-    print
-    print 'starting single_process_single_source_map_list_example_2'
+    print ('finished single_process_single_source_filter_element_example_1')
+    print ('')
+    print ('starting single_process_single_source_map_list_example_2')
     single_process_single_source_map_list_example_2()
-    print 'finished single_process_single_source_map_list_example_2'
-    print    
-    print 'starting single_process_single_source_map_list_example_3'
+    print ('finished single_process_single_source_map_list_example_2')
+    print ('')
+    print ('starting single_process_single_source_map_list_example_3')
     single_process_single_source_map_list_example_3()
-    print 'finished single_process_single_source_map_list_example_3'
-    print    
-    print 'starting single_process_single_source_map_list_example_4'
+    print ('finished single_process_single_source_map_list_example_3')
+    print ('')
+    print ('starting single_process_single_source_map_list_example_4')
     single_process_single_source_map_list_example_4()
-    print 'finished single_process_single_source_map_list_example_4'
-    print    
-    print 'starting single_process_single_source_map_window_example_1'
+    print ('finished single_process_single_source_map_list_example_4')
+    print ('')
+    print ('starting single_process_single_source_map_window_example_1')
     single_process_single_source_map_window_example_1()
-    print 'finished single_process_single_source_map_window_example_1'
-    print    
+    print ('finished single_process_single_source_map_window_example_1')
+    print ('')
 
 
     
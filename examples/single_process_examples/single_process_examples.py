@@ -9,6 +9,7 @@ processes with multiple sources.
 
 import sys
 import os
+import numpy as np
 
 sys.path.append(os.path.abspath("../../IoTPy/multiprocessing"))
 sys.path.append(os.path.abspath("../../IoTPy/core"))
@@ -432,14 +433,12 @@ def clock_offset_estimation_single_process_multiple_sources():
     time_interval = 0.1
     num_steps = 20
     def average_of_list(a_list):
-        if a_list:
-            # Remove None elements from the list
-            a_list = [i for i in a_list if i is not None]
-            # Handle the non-empty list.
-            if a_list:
-                return sum(a_list)/float(len(a_list))
-        # Handle the empty list
-        return 0.0
+        # Convert the window to an array of floats in which None
+        # elements become NaN, and then remove the NaN elements.
+        arr = np.asarray(a_list, dtype=np.float64)
+        arr = arr[~np.isnan(arr)]
+        # Return 0.0 if the window has no numbers.
+        return float(arr.mean()) if arr.size else 0.0
 
     # STEP 1: DEFINE SOURCES
     def ntp_0(out_stream):
@@ -508,53 +507,53 @@ def clock_offset_estimation_single_process_multiple_sources():
 # ---------------------------------------------------------------- 
 
 if __name__ == '__main__':
-    print
-    print '-----------------------------------------------------'
-    print 'Each process terminates when no more inputs arrive'
-    print
-    print '-----------------------------------------------------'
-    print 'Starting single_process_single_source_example_1()'
+    print ('')
+    print ('-----------------------------------------------------')
+    print ('Each process terminates when no more inputs arrive')
+    print ('')
+    print ('-----------------------------------------------------')
+    print ('Starting single_process_single_source_example_1()')
     #single_process_single_source_example_1()
-    print 'Finished single_process_single_source_example_1()'
-    print '10, 20, 30, 40 will be appended to file test.dat'
-    print
-    print '-----------------------------------------------------'
-    print
-    print 'Starting single_process_multiple_sources_example_1()'
+    print ('Finished single_process_single_source_example_1()')
+    print ('10, 20, 30, 40 will be appended to file test.dat')
+    print ('')
+    print ('-----------------------------------------------------')
+    print ('')
+    print ('Starting single_process_multiple_sources_example_1()')
     #single_process_multiple_sources_example_1()
-    print 'Finished single_process_multiple_sources_example_1()'
-    print '(1, r1), (2, r2), ... will be appended to file output.dat'
-    print 'where r1, r2, .. are random numbers.'
-    print
-    print 'Starting map_element_example_1()'
+    print ('Finished single_process_multiple_sources_example_1()')
+    print ('(1, r1), (2, r2), ... will be appended to file output.dat')
+    print ('where r1, r2, .. are random numbers.')
+    print ('')
+    print ('Starting map_element_example_1()')
     #map_element_example_1()
-    print 'Finished map_element_example_1()'
-    print '[0, 10, 20, ... ,90] will be appended to map_element_example_1.dat'
-    print
-    print 'Starting map_element_example_2()'
+    print ('Finished map_element_example_1()')
+    print ('[0, 10, 20, ... ,90] will be appended to map_element_example_1.dat')
+    print ('')
+    print ('Starting map_element_example_2()')
     #map_element_example_2()
-    print 'Finished map_element_example_1()'
-    print 'HELLO WORLD will be appended to map_element_example_2.dat'
-    print
-    print 'Starting map_element_example_3()'
+    print ('Finished map_element_example_1()')
+    print ('HELLO WORLD will be appended to map_element_example_2.dat')
+    print ('')
+    print ('Starting map_element_example_3()')
     map_element_example_3()
-    print 'Finished map_element_example_3()'
-    print '[0, 2, 5, 9, 14, 20, 27, 35, 44, 54] appended to map_element_example_3.dat'
-    print
-    print 'Starting filter_element_example_1()'
+    print ('Finished map_element_example_3()')
+    print ('[0, 2, 5, 9, 14, 20, 27, 35, 44, 54] appended to map_element_example_3.dat')
+    print ('')
+    print ('Starting filter_element_example_1()')
     filter_element_example_1()
-    print 'Finished filter_element_example_1()'
-    print '[1, 3, 5, 7, 9] appended to filter_element_example_1.dat'
-    print
-    print '-----------------------------------------------------'
-    print
-    print 'Starting'
-    print 'clock_offset_estimation_single_process_multiple_sources'
-    print 'This step takes time detecting that source threads have'
-    print 'terminated. These sources get data from ntp servers.'
+    print ('Finished filter_element_example_1()')
+    print ('[1, 3, 5, 7, 9] appended to filter_element_example_1.dat')
+    print ('')
+    print ('-----------------------------------------------------')
+    print ('')
+    print ('Starting')
+    print ('clock_offset_estimation_single_process_multiple_sources')
+    print ('This step takes time detecting that source threads have')
+    print ('terminated. These sources get data from ntp servers.')
     clock_offset_estimation_single_process_multiple_sources()
-    print 'Finished'
-    print 'clock_offset_estimation_single_process_multiple_sources'
-    print 'The average of offsets will be appended to average.dat'
-    print
-    print '-----------------------------------------------------'
+    print ('Finished')
+    print ('clock_offset_estimation_single_process_multiple_sources')
+    print ('The average of offsets will be appended to average.dat')
+    print ('')
+    print ('-----------------------------------------------------')
@@ -1,18 +1,21 @@
-import sys
 import os
-sys.path.append(os.path.abspath("../../IoTPy/helper_functions"))
-sys.path.append(os.path.abspath("../../IoTPy/core"))
-sys.path.append(os.path.abspath("../../IoTPy/agent_types"))
-sys.path.append(os.path.abspath("../../IoTPy/concurrency"))
-from source import source_func_to_stream
-from multicore import multicore
-from multicore import run_single_process_single_source
-from multicore import copy_data_to_source, source_finished
-from sink import sink_element
-from print_stream import print_stream
+from IoTPy.agent_types.sink import sink_element
+from IoTPy.helper_functions.print_stream import print_stream
+from IoTPy.helper_functions.moving_median import moving_median
+from IoTPy.helper_functions.ring_buffer import ring_buffer
+from IoTPy.concurrency.multicore import get_processes_and_procs
+from IoTPy.concurrency.multicore import extend_stream, terminate_stream
 
 import time
-import ntplib
+import atexit
+import numpy as np
+import threading
+import collections
+import struct
+import socket
+import selectors
+import asyncio
+import concurrent.futures
 import statistics
 import logging
 # If an ntp service is unavailable then this logged in the log file
@@ -20,6 +23,328 @@ import logging
 logging.basicConfig(
     filename='ntp_service_operation.txt', level=logging.DEBUG)  
 
+# Each process has its own pool of threads which is used to query
+# ntp servers concurrently. The pool is reused across calls so that
+# threads are not created for each query. A process created by fork
+# gets a copy of the state of the parent's pool but none of its
+# threads; so the pool is created afresh in each process.
+# _ntp_pool is [process id, pool].
+_ntp_pool = [None, None]
+_ntp_pool_lock = threading.Lock()
+
+def ntp_pool():
+    with _ntp_pool_lock:
+        if _ntp_pool[0] != os.getpid():
+            _ntp_pool[0] = os.getpid()
+            _ntp_pool[1] = concurrent.futures.ThreadPoolExecutor(max_workers=8)
+        return _ntp_pool[1]
+
+# Offsets obtained from ntp servers are cached for OFFSET_TTL
+# seconds so that a source that asks for offsets many times a
+# second does not query a server (and get rate limited by it)
+# each time. _offset_cache[ntp_server] is (time, offset).
+OFFSET_TTL = 15.0
+_offset_cache = {}
+_offset_cache_lock = threading.Lock()
+
+# A server that replies with a Kiss-o'-Death packet (stratum 0)
+# whose kiss code, in the reference id, is RATE, DENY or RSTR is
+# not queried again until its back-off interval has elapsed. The
+# interval doubles with each such kiss, up to MAX_BACKOFF seconds,
+# and is reset when the server replies normally.
+# _backoff[ntp_server] is (next time to query, interval).
+KISS_CODES = (b'RATE', b'DENY', b'RSTR')
+MIN_BACKOFF = 1.0
+MAX_BACKOFF = 3600.0
+_backoff = {}
+_backoff_lock = threading.Lock()
+
+def backed_off(ntp_server):
+    # Returns True if ntp_server must not be queried now.
+    with _backoff_lock:
+        next_time, interval = _backoff.get(ntp_server, (0.0, MIN_BACKOFF))
+    return time.time() < next_time
+
+def back_off(ntp_server, kiss_code):
+    # Called when ntp_server replies with a Kiss-o'-Death packet.
+    if kiss_code in KISS_CODES:
+        with _backoff_lock:
+            next_time, interval = _backoff.get(
+                ntp_server, (0.0, MIN_BACKOFF))
+            _backoff[ntp_server] = (
+                time.time() + interval, min(2*interval, MAX_BACKOFF))
+
+def reset_backoff(ntp_server):
+    # Called when ntp_server replies normally.
+    with _backoff_lock:
+        _backoff.pop(ntp_server, None)
+
+# Failed requests are counted for each server and the counts are
+# logged at most once every FAILURE_LOG_INTERVAL seconds, rather
+# than writing a log record for each failure. Counts that have not
+# been logged are logged by flush_failures(), which is called when
+# the program exits. A process started by multiprocessing does
+# not run atexit functions; so a source thread calls
+# flush_failures() when it finishes.
+FAILURE_LOG_INTERVAL = 5.0
+_failure_counts = collections.Counter()
+_last_failure_log = [0.0]
+_failure_lock = threading.Lock()
+
+def _log_failure_counts():
+    # Call with _failure_lock held.
+    if _failure_counts:
+        logging.warning('No response from ntp servers: %s',
+                        dict(_failure_counts))
+        _failure_counts.clear()
+    _last_failure_log[0] = time.time()
+
+def log_failure(ntp_server, error):
+    # Failures are counted for each server and type of error.
+    with _failure_lock:
+        _failure_counts[(ntp_server, type(error).__name__)] += 1
+        if time.time() - _last_failure_log[0] > FAILURE_LOG_INTERVAL:
+            _log_failure_counts()
+
+def flush_failures():
+    with _failure_lock:
+        _log_failure_counts()
+
+atexit.register(flush_failures)
+
+
+#------------------------------------------------
+# Ntp requests and replies
+#------------------------------------------------
+# Seconds from the ntp epoch (1900) to the unix epoch (1970).
+NTP_EPOCH_DELTA = 2208988800
+NTP_PORT = 123
+# Compiled once rather than each time a packet is packed or unpacked.
+NTP_TIMESTAMP = struct.Struct('!II')
+NTP_REQUEST = struct.Struct('!B39xII')
+
+def ntp_timestamp(data, index):
+    # Returns the 64-bit ntp timestamp starting at data[index]
+    # as seconds since the unix epoch.
+    seconds, fraction = NTP_TIMESTAMP.unpack_from(data, index)
+    return seconds - NTP_EPOCH_DELTA + fraction/2.0**32
+
+def ntp_request(send_time):
+    # Returns a 48 byte client request: the first byte is 0x1b
+    # (leap indicator 0, version 3, mode 3), the transmit timestamp
+    # in bytes 40-47 is send_time, and all other bytes are 0.
+    # The server copies the transmit timestamp of the request into
+    # the originate timestamp (bytes 24-31) of its reply; so a reply
+    # is matched to its request by comparing these timestamps.
+    seconds = int(send_time)
+    fraction = int((send_time - seconds)*2**32)
+    return NTP_REQUEST.pack(0x1b, seconds + NTP_EPOCH_DELTA, fraction)
+
+class KissOfDeath(Exception):
+    # Raised for a reply with stratum 0. Such a reply is a
+    # Kiss-o'-Death packet and its timestamps are not usable.
+    # The argument is the kiss code in the reference id, such as
+    # b'RATE'.
+    pass
+
+def check_ntp_reply(data):
+    # data[1] is the stratum and data[12:16] is the reference id.
+    if data[1] == 0:
+        raise KissOfDeath(data[12:16])
+
+#------------------------------------------------
+# Blocking ntp queries on a reused socket
+#------------------------------------------------
+# Each thread keeps one UDP socket for all its ntp requests rather
+# than opening and closing a socket for each request as ntplib
+# does. Addresses of ntp servers are resolved at most once every
+# DNS_TTL seconds, rather than on each request, and cached.
+# _server_addresses[ntp_server] is (address, expiry time).
+DNS_TTL = 300.0
+_thread_local = threading.local()
+_server_addresses = {}
+_server_addresses_lock = threading.Lock()
+
+def ntp_server_address(ntp_server):
+    now = time.time()
+    with _server_addresses_lock:
+        address, expiry = _server_addresses.get(ntp_server, (None, 0.0))
+    if now > expiry:
+        address = (socket.gethostbyname(ntp_server), NTP_PORT)
+        with _server_addresses_lock:
+            _server_addresses[ntp_server] = (address, now + DNS_TTL)
+    return address
+
+def ntp_offset(ntp_server, timeout=1.0):
+    """
+    Returns the offset of the local clock from the clock of
+    ntp_server. Raises socket.timeout if the server does not
+    reply within timeout seconds, and KissOfDeath if the reply
+    has stratum 0.
+
+    """
+    sock = getattr(_thread_local, 'sock', None)
+    if sock is None:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        _thread_local.sock = sock
+    address = ntp_server_address(ntp_server)
+    t1 = time.time()
+    request = ntp_request(t1)
+    sock.sendto(request, address)
+    # Skip replies whose originate timestamp is not the transmit
+    # timestamp of this request: they are late replies to earlier
+    # requests on this socket that timed out. The timeout is for
+    # the request as a whole, not for each reply.
+    deadline = t1 + timeout
+    while True:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise socket.timeout(
+                'no reply from ntp server {0}'.format(ntp_server))
+        sock.settimeout(remaining)
+        data, sender = sock.recvfrom(48)
+        if len(data) == 48 and data[24:32] == request[40:48]:
+            break
+    t4 = time.time()
+    check_ntp_reply(data)
+    t2, t3 = ntp_timestamp(data, 32), ntp_timestamp(data, 40)
+    return ((t2 - t1) + (t3 - t4))/2.0
+
+#------------------------------------------------
+# Multiplexed ntp queries from a single thread
+#------------------------------------------------
+class ntp_multiplexer(object):
+    """
+    Queries many ntp servers from a single thread with a single
+    non-blocking UDP socket. Each call to tick() sends a request
+    to every server and then uses a selector to wait for replies
+    from all of them at once, rather than a thread per server
+    waiting for a reply from one server.
+
+    """
+    def __init__(self, ntp_servers, timeout=1.0):
+        self.ntp_servers = ntp_servers
+        self.timeout = timeout
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.sock, selectors.EVENT_READ)
+    def tick(self):
+        """
+        Returns a dict whose keys are the servers that replied
+        within timeout seconds and whose values are the offsets
+        of the local clock from the clocks of the servers. Servers
+        that are backed off are not queried, and servers that
+        reply with a Kiss-o'-Death packet are backed off and are
+        not in the dict.
+
+        """
+        # outstanding[transmit timestamp of a request] is the pair
+        # (server, time request sent). A reply is matched to its
+        # request by its originate timestamp, which echoes the
+        # transmit timestamp of the request. So late replies to
+        # requests from earlier ticks are ignored, and servers whose
+        # names resolve to the same address are kept apart.
+        outstanding = {}
+        for ntp_server in self.ntp_servers:
+            if backed_off(ntp_server):
+                continue
+            try:
+                address = ntp_server_address(ntp_server)
+                t1 = time.time()
+                request = ntp_request(t1)
+                while request[40:48] in outstanding:
+                    # Make each transmit timestamp unique.
+                    t1 += 1e-6
+                    request = ntp_request(t1)
+                outstanding[request[40:48]] = (ntp_server, t1)
+                self.sock.sendto(request, address)
+            except OSError as error:
+                log_failure(ntp_server, error)
+        offsets = {}
+        deadline = time.time() + self.timeout
+        while outstanding:
+            remaining = deadline - time.time()
+            if remaining <= 0 or not self.selector.select(remaining):
+                break
+            try:
+                data, sender = self.sock.recvfrom(48)
+            except BlockingIOError:
+                continue
+            t4 = time.time()
+            if len(data) < 48 or data[24:32] not in outstanding:
+                continue
+            ntp_server, t1 = outstanding.pop(data[24:32])
+            try:
+                check_ntp_reply(data)
+            except KissOfDeath as kiss:
+                back_off(ntp_server, kiss.args[0])
+                continue
+            reset_backoff(ntp_server)
+            t2, t3 = ntp_timestamp(data, 32), ntp_timestamp(data, 40)
+            offsets[ntp_server] = ((t2 - t1) + (t3 - t4))/2.0
+        for ntp_server, t1 in outstanding.values():
+            log_failure(ntp_server, socket.timeout())
+        return offsets
+    def close(self):
+        self.selector.close()
+        self.sock.close()
+
+#------------------------------------------------
+# Non-blocking ntp queries with asyncio
+#------------------------------------------------
+class ntp_protocol(asyncio.DatagramProtocol):
+    """
+    Sends a single ntp request and sets future to the pair
+    (data, receive_time) where data is the reply and receive_time
+    is the time at which the reply was received. The time at
+    which the request was sent is send_time.
+
+    """
+    def __init__(self, future):
+        self.future = future
+    def connection_made(self, transport):
+        self.send_time = time.time()
+        self.request = ntp_request(self.send_time)
+        transport.sendto(self.request)
+    def datagram_received(self, data, addr):
+        # Ignore replies that do not echo the transmit timestamp
+        # of the request.
+        if (not self.future.done() and len(data) == 48 and
+            data[24:32] == self.request[40:48]):
+            self.future.set_result((data, time.time()))
+    def error_received(self, exc):
+        if not self.future.done():
+            self.future.set_exception(exc)
+
+async def ntp_offset_async(ntp_server, loop, timeout=5.0):
+    """
+    Returns the offset of the local clock from the clock of
+    ntp_server. The request does not block the thread running
+    loop; so a single loop can query many servers at once.
+    Raises KissOfDeath if the reply has stratum 0.
+
+    """
+    future = loop.create_future()
+    transport, protocol = await loop.create_datagram_endpoint(
+        lambda: ntp_protocol(future), remote_addr=(ntp_server, NTP_PORT))
+    try:
+        data, receive_time = await asyncio.wait_for(future, timeout)
+    finally:
+        transport.close()
+    check_ntp_reply(data)
+    # t1: request sent, t2: request received by server,
+    # t3: response sent by server, t4: response received.
+    t1, t4 = protocol.send_time, receive_time
+    t2, t3 = ntp_timestamp(data, 32), ntp_timestamp(data, 40)
+    return ((t2 - t1) + (t3 - t4))/2.0
+
+async def ntp_offsets_async(ntp_servers, loop):
+    # Query all the servers at once. A server that fails
+    # returns an exception rather than an offset.
+    return await asyncio.gather(
+        *[ntp_offset_async(ntp_server, loop) for ntp_server in ntp_servers],
+        return_exceptions=True)
 
 #------------------------------------------------
 # An ntp manager class
@@ -28,13 +353,26 @@ class ntp_single_server(object):
     def __init__(self, ntp_server):
         # ntp_server is a string such as "0.us.pool.ntp.org"
         self.ntp_server = ntp_server
-        self.ntp_client = ntplib.NTPClient()
     def offset(self):
+        with _offset_cache_lock:
+            entry = _offset_cache.get(self.ntp_server)
+        if entry and time.time() - entry[0] < OFFSET_TTL:
+            return entry[1]
+        if backed_off(self.ntp_server):
+            return 0.0
         try:
-            response = self.ntp_client.request(self.ntp_server, version=3)
-            return response.offset
-        except:
-            print ('no response from ntp client')
+            offset = ntp_offset(self.ntp_server)
+            reset_backoff(self.ntp_server)
+            with _offset_cache_lock:
+                _offset_cache[self.ntp_server] = (time.time(), offset)
+            return offset
+        except KissOfDeath as kiss:
+            back_off(self.ntp_server, kiss.args[0])
+            return 0.0
+        except OSError as error:
+            # socket.timeout and socket.gaierror are subclasses of
+            # OSError.
+            log_failure(self.ntp_server, error)
             return 0.0
 
 class ntp_multiple_servers(object):
@@ -57,20 +395,84 @@ class ntp_multiple_servers(object):
                 return (time.time(), offset)
         # None of the servers returned an offset. So return 0
         return (time.time(), 0.0)
+    def ntp_time(self):
+        # An estimate of ntp time: the local time corrected by the
+        # first offset. A source can put ntp times directly into its
+        # stream rather than put offsets into a stream and then use
+        # a map_element agent to add the local time to each offset.
+        # The offset is obtained before the local time is read, so
+        # that the time taken by the query is not in the estimate.
+        # Returns None if none of the servers returned an offset.
+        offset = self.first_offset()
+        return time.time() + offset if offset else None
     def offsets(self):
+        # Query all the servers concurrently so that the time taken
+        # is the longest round trip rather than the sum of round
+        # trips. Each thread of the pool has its own socket.
+        pool = ntp_pool()
+        futures = [pool.submit(server.offset) for server in self.servers]
         offsets = []
-        for server in self.servers:
-            offset = server.offset()
+        for future in futures:
+            offset = future.result()
             if offset:
                 offsets.append(offset)
         return offsets
+    def offsets_async(self):
+        # Same as offsets() except that all the servers are queried
+        # from a single event loop rather than from a pool of threads.
+        loop = asyncio.new_event_loop()
+        try:
+            results = loop.run_until_complete(
+                ntp_offsets_async(self.ntp_servers, loop))
+        finally:
+            loop.close()
+        return [offset for offset in results
+                if offset and not isinstance(offset, Exception)]
     def mean_offset(self):
-        offsets = self.offsets()
-        return statistics.mean(offsets) if offsets else 0.0
+        offsets = np.asarray(self.offsets(), dtype=np.float64)
+        return float(offsets.mean()) if offsets.size else 0.0
     def median_offset(self):
-        return statistics.median(offset) if self.offsets else 0.0
+        offsets = np.asarray(self.offsets(), dtype=np.float64)
+        return float(np.median(offsets)) if offsets.size else 0.0
     def mode_offset(self):
-        return statistics.mode(offset) if self.offsets else 0.0
+        offsets = self.offsets()
+        return statistics.mode(offsets) if offsets else 0.0
+
+#------------------------------------------------
+# Source threads that get data from ntp servers
+#------------------------------------------------
+def ntp_source_thread_target(func, num_steps, time_interval):
+    """
+    Returns the target of a source thread that copies the value
+    returned by func() to its source num_steps times, once every
+    time_interval seconds.
+
+    """
+    def source_thread_target(procs):
+        for i in range(num_steps):
+            v = func()
+            extend_stream(procs, data=[v], stream_name='ntp')
+            time.sleep(time_interval)
+        flush_failures()
+        terminate_stream(procs, stream_name='ntp')
+    return source_thread_target
+
+def run_single_process_single_source(source_thread_target, compute_func):
+    # Runs compute_func in a single process whose input stream is
+    # the source stream 'ntp' which is extended by a thread that
+    # executes source_thread_target.
+    multicore_specification = [
+        # Streams
+        [('ntp', 'x')],
+        # Processes
+        [{'name': 'process', 'agent': compute_func,
+          'inputs': ['ntp'], 'sources': ['ntp']}]]
+    processes, procs = get_processes_and_procs(multicore_specification)
+    procs['process'].threads = [threading.Thread(
+        target=source_thread_target, args=(procs,))]
+    for process in processes: process.start()
+    for process in processes: process.join()
+    for process in processes: process.terminate()
 
 #----------------------------------------------------------
 #          TESTS
@@ -102,13 +504,8 @@ def test_0():
     # explicitly writing processes and connections.
     #------------------------------------------------
     ntp_obj = ntp_single_server("0.us.pool.ntp.org")
-    def source_thread_target(source):
-        num_steps=3
-        for i in range(num_steps):
-            v = ntp_obj.offset()
-            copy_data_to_source([v], source)
-            time.sleep(0.01)
-        source_finished(source)
+    source_thread_target = ntp_source_thread_target(
+        ntp_obj.offset, num_steps=3, time_interval=0.01)
     def compute_func(in_streams, out_streams):
         print_stream(in_streams[0])
     run_single_process_single_source(source_thread_target, compute_func)
@@ -116,57 +513,193 @@ def test_0():
 
 def test_1():
     servers = ntp_multiple_servers(list_of_ntp_servers)
-    def source_thread_target(source):
-        num_steps=3
-        for i in range(num_steps):
-            v = servers.first_offset()
-            copy_data_to_source([v], source)
-            time.sleep(0.01)
-        source_finished(source)
+    source_thread_target = ntp_source_thread_target(
+        servers.first_offset, num_steps=3, time_interval=0.01)
     def compute_func(in_streams, out_streams):
         print_stream(in_streams[0])
     run_single_process_single_source(source_thread_target, compute_func)
 
 def test_2():
-    def source_thread_target(source):
-        servers = ntp_multiple_servers(list_of_ntp_servers)
-        num_steps=1
-        for i in range(num_steps):
-            v = servers.time_and_first_offset()
-            copy_data_to_source([v], source)
+    servers = ntp_multiple_servers(list_of_ntp_servers)
+    source_thread_target = ntp_source_thread_target(
+        servers.time_and_first_offset, num_steps=1, time_interval=0.01)
+    def compute_func(in_streams, out_streams):
+        print_stream(in_streams[0])
+    run_single_process_single_source(source_thread_target, compute_func)
+
+def test_3():
+    #------------------------------------------------
+    # The source puts the mean of the offsets from all
+    # the servers into its stream. The servers are
+    # queried concurrently by offsets(). The offsets
+    # are also obtained in this process before the
+    # process with the source is created.
+    #------------------------------------------------
+    servers = ntp_multiple_servers(list_of_ntp_servers)
+    print ('offsets: {0}'.format(servers.offsets()))
+    print ('offsets_async: {0}'.format(servers.offsets_async()))
+    print ('median offset: {0}'.format(servers.median_offset()))
+    source_thread_target = ntp_source_thread_target(
+        servers.mean_offset, num_steps=3, time_interval=0.01)
+    def compute_func(in_streams, out_streams):
+        print_stream(in_streams[0])
+    run_single_process_single_source(source_thread_target, compute_func)
+
+def test_4():
+    # A sink agent prints the median of the 3 most recent offsets
+    # from the source, maintained by a moving_median.
+    servers = ntp_multiple_servers(list_of_ntp_servers)
+    source_thread_target = ntp_source_thread_target(
+        servers.first_offset, num_steps=6, time_interval=0.01)
+    def compute_func(in_streams, out_streams):
+        window = moving_median(window_size=3)
+        def append_and_print_median(offset):
+            window.append(offset)
+            print ('offset {0}, median of last 3 offsets {1}'.format(
+                offset, window.median()))
+        sink_element(func=append_and_print_median, in_stream=in_streams[0])
+    run_single_process_single_source(source_thread_target, compute_func)
+
+def test_5():
+    #------------------------------------------------
+    # Benchmark of concurrent ntp queries. All the
+    # servers are queried at once, num_rounds times,
+    # and the time taken by each query is measured,
+    # without sleeping between rounds. A query that
+    # fails, or gets a Kiss-o'-Death reply, has no
+    # offset.
+    #------------------------------------------------
+    num_rounds = 3
+    async def timed_offset(ntp_server, loop):
+        start = time.perf_counter()
+        try:
+            offset = await ntp_offset_async(ntp_server, loop)
+        except (asyncio.TimeoutError, OSError, KissOfDeath):
+            offset = None
+        return (ntp_server, offset, time.perf_counter() - start)
+    async def timed_round(loop):
+        return await asyncio.gather(
+            *[timed_offset(ntp_server, loop)
+              for ntp_server in list_of_ntp_servers])
+
+    loop = asyncio.new_event_loop()
+    try:
+        start = time.perf_counter()
+        for i in range(num_rounds):
+            for ntp_server, offset, elapsed in loop.run_until_complete(
+                    timed_round(loop)):
+                print ('{0}: offset {1}, response time {2:.4f} s'.format(
+                    ntp_server, offset, elapsed))
+        total = time.perf_counter() - start
+    finally:
+        loop.close()
+    num_queries = num_rounds*len(list_of_ntp_servers)
+    print ('{0} queries in {1:.4f} s: {2:.1f} queries per second'.format(
+        num_queries, total, num_queries/total))
+
+    # The same queries through ntp_multiple_servers.offsets_async().
+    servers = ntp_multiple_servers(list_of_ntp_servers)
+    start = time.perf_counter()
+    offsets = servers.offsets_async()
+    print ('offsets_async: offsets {0} in {1:.4f} s'.format(
+        offsets, time.perf_counter() - start))
+
+def test_6():
+    # The source puts estimates of ntp time, rather than offsets,
+    # into its stream.
+    servers = ntp_multiple_servers(list_of_ntp_servers)
+    source_thread_target = ntp_source_thread_target(
+        servers.ntp_time, num_steps=3, time_interval=0.01)
+    def compute_func(in_streams, out_streams):
+        print_stream(in_streams[0])
+    run_single_process_single_source(source_thread_target, compute_func)
+
+def test_7():
+    # A single source thread gets offsets from all the servers
+    # with one ntp_multiplexer, and puts a dict of offsets, one
+    # for each server that replied, into its stream each step.
+    def source_thread_target(procs):
+        multiplexer = ntp_multiplexer(list_of_ntp_servers)
+        for i in range(3):
+            extend_stream(procs, data=[multiplexer.tick()], stream_name='ntp')
             time.sleep(0.01)
-        source_finished(source)
+        multiplexer.close()
+        flush_failures()
+        terminate_stream(procs, stream_name='ntp')
     def compute_func(in_streams, out_streams):
         print_stream(in_streams[0])
+    run_single_process_single_source(source_thread_target, compute_func)
 
-    # Specify processes and connections.
-    processes = \
-      {
-        'process':
-           {'in_stream_names_types': [('in', 'x')],
-            'out_stream_names_types': [],
-            'compute_func': compute_func,
-            'sources':
-              {'ntp':
-                  {'type': 'x',
-                   'func': source_thread_target
-                  },
-               },
-            'actuators': {}
-           }
-      }
-    
-    connections = \
-      {
-          'process' :
-            {
-                'ntp' : [('process', 'in')]
-            }
-      }
-
-    multicore(processes, connections)
+def test_8():
+    # A sink agent appends the offsets from the source to a
+    # ring_buffer and prints the moving-window average of the 3
+    # most recent offsets.
+    servers = ntp_multiple_servers(list_of_ntp_servers)
+    source_thread_target = ntp_source_thread_target(
+        servers.first_offset, num_steps=6, time_interval=0.01)
+    def compute_func(in_streams, out_streams):
+        offsets = ring_buffer(capacity=4)
+        def append_and_print_mean(offset):
+            offsets.append(offset)
+            print ('offset {0}, mean of last 3 offsets {1}'.format(
+                offset, offsets.mean(3)))
+        sink_element(func=append_and_print_mean, in_stream=in_streams[0])
+    run_single_process_single_source(source_thread_target, compute_func)
+
+def test_backoff():
+    #------------------------------------------------
+    # Test that a server that replies with a Kiss-o'-
+    # Death packet is not queried again until its
+    # back-off interval has elapsed. The server is a
+    # UDP socket on this host that replies to each
+    # request with the next reply in a list. A reply is
+    # (stratum, reference id, offset).
+    #------------------------------------------------
+    replies = [(0, b'RATE', 0.0), (0, b'INIT', 0.0), (2, b'GPS\x00', 0.5)]
+    server_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server_sock.bind(('127.0.0.1', 0))
+    requests = []
+    def serve():
+        for stratum, ref_id, offset in replies:
+            request, address = server_sock.recvfrom(48)
+            requests.append(request)
+            server_time = time.time() + offset
+            seconds = int(server_time)
+            fraction = int((server_time - seconds)*2**32)
+            server_timestamp = struct.pack(
+                '!II', seconds + NTP_EPOCH_DELTA, fraction)
+            # The originate timestamp is the transmit timestamp
+            # of the request.
+            reply = (struct.pack('!BB10x', 0x1c, stratum) + ref_id +
+                     8*b'\x00' + request[40:48] + 2*server_timestamp)
+            server_sock.sendto(reply, address)
+    server_thread = threading.Thread(target=serve)
+    server_thread.daemon = True
+    server_thread.start()
+    _server_addresses['backoff.test'] = (
+        server_sock.getsockname(), float('inf'))
+    ntp_obj = ntp_single_server('backoff.test')
+    # The server is backed off after the first reply.
+    assert ntp_obj.offset() == 0.0
+    assert ntp_obj.offset() == 0.0
+    assert len(requests) == 1
+    assert _backoff['backoff.test'][1] == 2*MIN_BACKOFF
+    # Make the back-off interval elapse. A stratum 0 reply whose
+    # kiss code is not in KISS_CODES is discarded, but the server
+    # is not backed off again.
+    _backoff['backoff.test'] = (0.0, _backoff['backoff.test'][1])
+    assert ntp_obj.offset() == 0.0
+    assert len(requests) == 2
+    assert not backed_off('backoff.test')
+    # A normal reply resets the back-off interval.
+    assert abs(ntp_obj.offset() - 0.5) < 0.1
+    assert 'backoff.test' not in _backoff
+    server_thread.join()
+    server_sock.close()
+    print ('test_backoff passed')
 
 if __name__ == '__main__':
+    test_backoff()
     print ('starting test_0')
     test_0()
     print ('')
@@ -188,4 +721,40 @@ if __name__ == '__main__':
     print ('---------------------------')
     print ('')
     print ('')
-
+    print ('starting test_3')
+    test_3()
+    print ('')
+    print ('')
+    print ('---------------------------')
+    print ('')
+    print ('')
+    print ('starting test_4')
+    test_4()
+    print ('')
+    print ('')
+    print ('---------------------------')
+    print ('')
+    print ('')
+    print ('starting test_5')
+    test_5()
+    print ('')
+    print ('')
+    print ('---------------------------')
+    print ('')
+    print ('')
+    print ('starting test_6')
+    test_6()
+    print ('')
+    print ('')
+    print ('---------------------------')
+    print ('')
+    print ('')
+    print ('starting test_7')
+    test_7()
+    print ('')
+    print ('')
+    print ('---------------------------')
+    print ('')
+    print ('')
+    print ('starting test_8')
+    test_8()
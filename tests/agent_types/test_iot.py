@@ -11,6 +11,7 @@ These arguments may include streams and agents.
 
 """
 import numpy as np
+from numpy.lib.stride_tricks import as_strided
 import unittest
 
 # agent, stream, helper_control are in IoTPy/IoTPy/core
@@ -22,7 +23,7 @@ from IoTPy.core.helper_control import _no_value, _multivalue
 from IoTPy.agent_types.check_agent_parameter_types import *
 from IoTPy.helper_functions.recent_values import recent_values
 # iot is IoTPy/IoTPy/agent_types
-from IoTPy.agent_types.iot import iot, iot_merge
+from IoTPy.agent_types.iot import iot, iot_merge, iot_fused
 
 #---------------------------------------------------------------------------
 #     TESTS
@@ -118,6 +119,31 @@ class iot_test(unittest.TestCase):
         assert np.array_equal(
             recent_values(y), np.array([0, 2, 4, 6, 8]))
 
+    def test_simple_array_slice(self):
+        """
+        The array passed to func by iot for a StreamArray is a
+        C-contiguous view into the buffer of the stream. No data
+        is copied.
+
+        """
+        x = StreamArray(name='x', dimension=2, dtype=float)
+        slices = []
+
+        def f(A):
+            slices.append(A)
+            return len(A)
+
+        iot(f, x)
+        x.extend(np.ones((3, 2), dtype=float))
+        run()
+        x.extend(np.zeros((4, 2), dtype=float))
+        run()
+        assert len(slices) == 2
+        for A in slices:
+            assert A.flags['C_CONTIGUOUS']
+            assert np.shares_memory(A, x.recent)
+        assert np.array_equal(slices[1], np.zeros((4, 2), dtype=float))
+
     def test_iot(self):
         x = StreamArray(dtype=int)
         y = StreamArray(dtype=int)
@@ -138,8 +164,13 @@ class iot_test(unittest.TestCase):
             len(A).
 
             """
-            y.extend(2*A)
-            z.extend(3*A)
+            # B is a single scratch array used for both outputs.
+            # y.extend() copies B into y, and so B can then be
+            # updated in place from 2*A to 3*A.
+            B = np.multiply(A, 2)
+            y.extend(B)
+            np.add(B, A, out=B)
+            z.extend(B)
             # Return a pointer into the input array.
             return len(A)
 
@@ -149,7 +180,8 @@ class iot_test(unittest.TestCase):
 
             """
             u.extend(A+A)
-            v.extend(A**2)
+            # A*A is cheaper than the general power function A**2.
+            v.extend(A*A)
             return len(A)
 
         # Create agents that wrap functions f and g.
@@ -172,6 +204,45 @@ class iot_test(unittest.TestCase):
         assert np.array_equal(recent_values(u), 2*np.arange(10, dtype=int))
         assert np.array_equal(recent_values(v), np.arange(10, dtype=int)**2)
 
+    def test_iot_fused(self):
+        x = StreamArray(dtype=int)
+        y = StreamArray(dtype=int)
+        u = StreamArray(dtype=int)
+        v = StreamArray(dtype=int)
+
+        def f(A, y):
+            y.extend(2*A)
+            return len(A)
+
+        def g(A, u):
+            u.extend(A*A)
+            return len(A)
+
+        def h(A, v):
+            """
+            Reads the input in pairs and so may leave one element
+            unread. Its pointer lags behind the pointers of f and g.
+
+            """
+            n = (len(A)//2)*2
+            v.extend(A[:n:2] + A[1:n:2])
+            return n
+
+        # Create a single agent that wraps f, g and h.
+        iot_fused([f, g, h], x, args_list=[[y], [u], [v]])
+
+        x.extend(np.arange(5, dtype=int))
+        run()
+        assert np.array_equal(recent_values(y), 2*np.arange(5, dtype=int))
+        assert np.array_equal(recent_values(u), np.arange(5, dtype=int)**2)
+        assert np.array_equal(recent_values(v), np.array([1, 5]))
+
+        x.extend(np.arange(5, 10, dtype=int))
+        run()
+        assert np.array_equal(recent_values(y), 2*np.arange(10, dtype=int))
+        assert np.array_equal(recent_values(u), np.arange(10, dtype=int)**2)
+        assert np.array_equal(recent_values(v), np.array([1, 5, 9, 13, 17]))
+
     def test_iot_merge(self):
         x = StreamArray(dtype=float)
         y = StreamArray(dtype=float)
@@ -190,11 +261,16 @@ class iot_test(unittest.TestCase):
             array. So, the function returns n_rows.
 
             """
-            n_rows = min([len(A) for A in A_list])
+            n_rows = min(len(A) for A in A_list)
             n_cols = len(A_list)
-            out = np.column_stack((A_list[0][:n_rows], A_list[1][:n_rows]))
+            # Copy the first n_rows elements of each array directly into
+            # a column of out. This avoids the intermediate arrays created
+            # by np.column_stack.
+            out = np.empty((n_rows, n_cols), dtype=A_list[0].dtype)
+            for j in range(n_cols):
+                out[:, j] = A_list[j][:n_rows]
             z.extend(out)
-            return [n_rows for A in A_list]
+            return [n_rows]*n_cols
 
         # Create the agent by wrapping function f.
         # A_list has two arrays from streams x and y.
@@ -223,6 +299,10 @@ class iot_test(unittest.TestCase):
         encapsulated in a class.
 
         """
+        # NumPy reductions that can operate on all windows at once
+        # by reducing along an axis.
+        reducers = (np.sum, np.mean, np.std, np.min, np.max)
+
         def __init__(self, func, in_stream, out_stream, window_size, step_size):
             # The function applied to each sliding window.
             self.func = func
@@ -232,6 +312,10 @@ class iot_test(unittest.TestCase):
             # This agent operates on sliding windows of the input stream.
             self.window_size = window_size
             self.step_size = step_size
+            # The buffer in which the outputs of a call to f are put.
+            # The buffer is reused across calls and grows when a call
+            # has more windows than the buffer can hold.
+            self.buffer = np.empty(0, dtype=int)
             # Create the agent by using iot to wrap function f (which is
             # specified below).
             iot(func=self.f, in_stream=self.in_stream)
@@ -242,11 +326,47 @@ class iot_test(unittest.TestCase):
             else:
                 # num_steps is the number of windows in the input A.
                 num_steps = int(1+(len(A) - self.window_size)//self.step_size)
-                self.output = np.zeros(num_steps, dtype=int)
-                # Iterate through the windows into A.
-                for i in range(num_steps):
-                    window = A[i*self.step_size : i*self.step_size+self.window_size]
-                    self.output[i] = self.func(window)
+                if len(self.buffer) < num_steps:
+                    self.buffer = np.empty(
+                        max(num_steps, 2*len(self.buffer)), dtype=int)
+                # out_stream.extend() copies self.output into out_stream.
+                # So, self.output can be a view into the buffer.
+                self.output = self.buffer[:num_steps]
+                if (self.func in (np.sum, np.mean) and
+                    np.issubdtype(A.dtype, np.integer)):
+                    # cumulative_sums[j] is the sum of the first j elements
+                    # of A. The sum of the window from index k to index
+                    # k + window_size is the difference between two
+                    # cumulative sums. This reads each element of A once
+                    # instead of once for each window that contains it.
+                    # The sums are exact because A is an array of integers.
+                    cumulative_sums = np.zeros(len(A)+1, dtype=np.int64)
+                    np.cumsum(A, out=cumulative_sums[1:])
+                    window_ends = num_steps*self.step_size
+                    np.subtract(
+                        cumulative_sums[self.window_size :
+                                        self.window_size + window_ends :
+                                        self.step_size],
+                        cumulative_sums[: window_ends : self.step_size],
+                        out=self.output)
+                    if self.func is np.mean:
+                        self.output[:] = self.output/self.window_size
+                elif self.func in self.reducers:
+                    # windows is a 2-D view into A in which row i is the
+                    # i-th window. No data is copied. Apply the reducer to
+                    # all the rows in a single call instead of calling it
+                    # once for each window.
+                    A = np.ascontiguousarray(A)
+                    windows = as_strided(
+                        A, shape=(num_steps, self.window_size),
+                        strides=(A.strides[0]*self.step_size, A.strides[0]),
+                        writeable=False)
+                    self.output[:] = self.func(windows, axis=1)
+                else:
+                    # Iterate through the windows into A.
+                    for i in range(num_steps):
+                        window = A[i*self.step_size : i*self.step_size+self.window_size]
+                        self.output[i] = self.func(window)
                 self.out_stream.extend(self.output)
                 # Return a pointer into the input array A.
                 return num_steps*self.step_size
@@ -266,6 +386,34 @@ class iot_test(unittest.TestCase):
         assert np.array_equal(recent_values(y),
                               np.array([10, 20., 30, 40, 50, 60, 70, 80]))
 
+    def test_iot_class_mean(self):
+        x = StreamArray(name='x', dtype=int)
+        y = StreamArray(name='y', dtype=int)
+        # Create an agent that wraps np.mean
+        sw = self.sliding_window_test(
+            func=np.mean, in_stream=x, out_stream=y, window_size=4, step_size=3)
+        x.extend(np.arange(10, dtype=int))
+        run()
+        assert np.array_equal(recent_values(y), np.array([1, 4, 7]))
+        x.extend(np.arange(10, 20, dtype=int))
+        run()
+        assert np.array_equal(recent_values(y),
+                              np.array([1, 4, 7, 10, 13, 16]))
+
+    def test_iot_class_max(self):
+        x = StreamArray(name='x', dtype=int)
+        y = StreamArray(name='y', dtype=int)
+        # Create an agent that wraps np.max
+        sw = self.sliding_window_test(
+            func=np.max, in_stream=x, out_stream=y, window_size=5, step_size=2)
+        x.extend(np.arange(10, dtype=int))
+        run()
+        assert np.array_equal(recent_values(y), np.array([4, 6, 8]))
+        x.extend(np.arange(10, 20, dtype=int))
+        run()
+        assert np.array_equal(recent_values(y),
+                              np.array([4, 6, 8, 10, 12, 14, 16, 18]))
+
 if __name__ == '__main__':
     unittest.main()    
     
@@ -22,8 +22,6 @@ import json
 import unittest
 import numpy as np
 
-import sys
-sys.path.append("../")
 from IoTPy.core.stream import Stream, StreamArray, run, _no_value
 from IoTPy.agent_types.op import map_element, map_list, map_window
 from IoTPy.agent_types.merge import zip_map
@@ -38,6 +36,8 @@ from IoTPy.concurrency.multicore import get_processes, get_processes_and_procs
 from IoTPy.concurrency.multicore import terminate_stream
 from IoTPy.concurrency.multicore import get_proc_that_inputs_source
 from IoTPy.concurrency.multicore import extend_stream
+from IoTPy.concurrency.multicore import copy_buffer_segment, MulticoreProcess
+from IoTPy.core.system_parameters import BUFFER_SIZE
 
 
 class test_multicore(unittest.TestCase):
@@ -870,5 +870,51 @@ class test_multicore(unittest.TestCase):
         print ('finished test_example_parameters_with_queue')
         print (' ')
 
+    def test_copy_buffer_segment(self):
+        # Copy segments of a shared buffer into a stream, including a
+        # segment that wraps around the end of the circular buffer.
+        buffer = multiprocessing.Array('i', BUFFER_SIZE)
+        buffer[:3] = [0, 1, 2]
+        buffer[BUFFER_SIZE-2:] = [-2, -1]
+        x = StreamArray(name='x', dtype='int')
+        copy_buffer_segment(
+            (0, 2), out_stream=x, buffer=buffer, in_stream_type='i')
+        copy_buffer_segment(
+            (BUFFER_SIZE-2, 3), out_stream=x, buffer=buffer, in_stream_type='i')
+        assert np.array_equal(recent_values(x), np.array([0, 1, -2, -1, 0, 1, 2]))
+
+    def test_copy_stream_wraps_around_buffer(self):
+        # Write data across the end of the circular buffer with
+        # copy_stream, and then copy the segment given in the message
+        # to the receiver into the receiver's stream.
+        class sender(object): pass
+        proc = sender()
+        buffer = multiprocessing.Array('i', BUFFER_SIZE)
+        buffer_ptr = multiprocessing.Value('i', BUFFER_SIZE-2)
+        q = queue.Queue()
+        proc.out_to_buffer = {'x': (buffer, buffer_ptr)}
+        proc.out_to_q_and_in_stream_signal_names = {'x': [(q, 'x_signal_')]}
+        proc.main_lock = threading.Lock()
+        proc.out_to_in = {'x': [('p1', 'x')]}
+        proc.process_ids = {'p1': 0}
+        proc.queue_status = [0]
+        x = StreamArray(name='x', dtype='int')
+
+        MulticoreProcess.copy_stream(proc, [10, 11, 12, 13, 14], 'x')
+        in_stream_signal_name, message = q.get_nowait()
+        assert in_stream_signal_name == 'x_signal_'
+        assert message == (BUFFER_SIZE-2, 3)
+        assert buffer_ptr.value == 3
+        assert buffer[BUFFER_SIZE-2:] == [10, 11]
+        assert buffer[:3] == [12, 13, 14]
+        copy_buffer_segment(message, out_stream=x, buffer=buffer, in_stream_type='i')
+
+        # The next write does not wrap around.
+        MulticoreProcess.copy_stream(proc, [15, 16], 'x')
+        in_stream_signal_name, message = q.get_nowait()
+        assert message == (3, 5)
+        copy_buffer_segment(message, out_stream=x, buffer=buffer, in_stream_type='i')
+        assert np.array_equal(recent_values(x), np.arange(10, 17))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,39 @@
+"""
+This module has tests for moving_median.
+
+"""
+import random
+import statistics
+import unittest
+
+# moving_median is in IoTPy/IoTPy/helper_functions
+from IoTPy.helper_functions.moving_median import moving_median
+
+class test_moving_median(unittest.TestCase):
+
+    def test_empty(self):
+        assert moving_median(window_size=3).median() == 0.0
+
+    def test_window_not_full(self):
+        m = moving_median(window_size=5)
+        for value in [3.0, 1.0]:
+            m.append(value)
+        assert m.median() == 2.0
+        m.append(2.5)
+        assert m.median() == 2.5
+
+    def test_against_statistics_median(self):
+        random.seed(0)
+        values = [random.uniform(-1.0, 1.0) for i in range(100)]
+        # Include repeated values, which must be removed from the
+        # sorted window one at a time.
+        values += [0.5]*10 + [-0.5, 0.5]*5
+        for window_size in [1, 4, 5]:
+            m = moving_median(window_size)
+            for i, value in enumerate(values):
+                m.append(value)
+                window = values[max(0, i+1-window_size) : i+1]
+                assert m.median() == statistics.median(window)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+"""
+This module has tests for ring_buffer.
+
+"""
+import numpy as np
+import unittest
+
+# ring_buffer is in IoTPy/IoTPy/helper_functions
+from IoTPy.helper_functions.ring_buffer import ring_buffer
+
+class test_ring_buffer(unittest.TestCase):
+
+    def test_empty(self):
+        buffer = ring_buffer(capacity=4)
+        assert buffer.recent().size == 0
+        assert buffer.mean() == 0.0
+
+    def test_not_full(self):
+        buffer = ring_buffer(capacity=4)
+        for value in [1.0, 2.0, 3.0]:
+            buffer.append(value)
+        assert np.array_equal(buffer.recent(), [1.0, 2.0, 3.0])
+        assert np.array_equal(buffer.recent(2), [2.0, 3.0])
+        assert buffer.mean() == 2.0
+
+    def test_wrap_around(self):
+        buffer = ring_buffer(capacity=4)
+        for value in range(1, 7):
+            buffer.append(float(value))
+        assert np.array_equal(buffer.recent(), [3.0, 4.0, 5.0, 6.0])
+        assert np.array_equal(buffer.recent(3), [4.0, 5.0, 6.0])
+        assert np.array_equal(buffer.recent(1), [6.0])
+        assert np.array_equal(buffer.recent(10), [3.0, 4.0, 5.0, 6.0])
+        assert buffer.mean(2) == 5.5
+
+    def test_full_at_end(self):
+        # The most recent value is at the end of the array, so
+        # recent() returns a view rather than a copy.
+        buffer = ring_buffer(capacity=4)
+        for value in range(1, 9):
+            buffer.append(float(value))
+        recent = buffer.recent()
+        assert np.array_equal(recent, [5.0, 6.0, 7.0, 8.0])
+        assert recent.base is buffer.buffer
+
+if __name__ == '__main__':
+    unittest.main()